@@ -0,0 +1,18 @@
+"""
+Test suites for the Product Service
+
+Importing the service connects to DATABASE_URI straight away, so the test
+database is chosen here, before any test module imports the service.
+"""
+import os
+from tests.workers import worker_database_uri
+
+# Default to a shared-cache in-memory SQLite database so the unit tests do
+# not need a running PostgreSQL. Set DATABASE_URI to test against Postgres.
+SHARED_DATABASE_URI = os.environ.setdefault(
+    "DATABASE_URI", "sqlite:///file:testdb?mode=memory&cache=shared&uri=true"
+)
+
+# Point each pytest-xdist worker at its own database, so even the service's
+# import-time create_all() never runs concurrently on the shared one
+os.environ["DATABASE_URI"] = worker_database_uri(SHARED_DATABASE_URI)
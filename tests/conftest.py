@@ -0,0 +1,69 @@
+"""
+Pytest fixtures shared by the test suites
+
+The service is only imported inside the fixtures: a pytest-xdist controller
+loads this file too, and importing the service there would connect to the
+shared database that the workers are kept away from.
+"""
+# pylint: disable=redefined-outer-name, import-outside-toplevel
+import sqlite3
+import pytest
+from tests import SHARED_DATABASE_URI
+from tests.workers import drop_worker_database
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database_snapshot():
+    """Initializes the database once and snapshots it when it is SQLite
+
+    Yields an in-memory copy of the freshly created database for
+    fresh_database to restore from, or None for any other database.
+    The engine's pool is released and any per-worker database removed at
+    the end of the session.
+    """
+    from service import app
+    from service.models import db, Product
+    from tests.utils import clear_table, init_test_db
+
+    init_test_db(app)
+    clear_table(Product)
+    snapshot = None
+    if db.engine.dialect.name == "sqlite":
+        snapshot = sqlite3.connect(":memory:")
+        connection = db.engine.raw_connection()
+        try:
+            connection.driver_connection.backup(snapshot)
+        finally:
+            connection.close()
+    yield snapshot
+    if snapshot is not None:
+        snapshot.close()
+    # release the connections init_test_db() warmed up
+    worker_url = db.engine.url
+    db.session.remove()
+    db.engine.dispose()
+    drop_worker_database(SHARED_DATABASE_URI, worker_url)
+
+
+@pytest.fixture
+def fresh_database(database_snapshot):
+    """Resets the database to the session snapshot after a test
+
+    Every test leaves the database the way the snapshot has it, whichever
+    suite runs next on the same worker.
+    """
+    from service.models import db, Product
+    from tests.utils import clear_table
+
+    yield
+    db.session.remove()
+    if database_snapshot is None:
+        clear_table(Product)
+        return
+
+    # sqlite3 copies the pages in C, which beats deleting row by row
+    connection = db.engine.raw_connection()
+    try:
+        database_snapshot.backup(connection.driver_connection)
+    finally:
+        connection.close()
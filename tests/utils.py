@@ -0,0 +1,107 @@
+"""
+Test utilities shared by the test suites
+"""
+import os
+import logging
+from flask import Flask
+from sqlalchemy import event, text
+from sqlalchemy.pool import QueuePool
+from service.models import db, init_db
+
+# the test default and each pytest-xdist worker's database are set in
+# tests/__init__.py
+DATABASE_URI = os.environ["DATABASE_URI"]
+
+# test data is never kept, so trade durability for speed
+SQLITE_PRAGMAS = (
+    "cache_size=-8000",
+    "temp_store=MEMORY",
+    "synchronous=OFF",
+    "journal_mode=MEMORY",
+)
+
+# set once the database has been initialized in this process
+_DB_INITIALIZED = False
+
+
+def init_test_db(app: Flask) -> None:
+    """Configures the app for testing and initializes the database once
+
+    Every test suite in a process (or pytest-xdist worker) shares the same
+    database, so the configuration, schema creation and pool warm up only
+    run for the first caller. This also keeps Flask-SQLAlchemy from being
+    set up again after the app has already served a request.
+
+    :param app: the Flask app
+    :type app: Flask
+
+    """
+    global _DB_INITIALIZED  # pylint: disable=global-statement
+    if _DB_INITIALIZED:
+        return
+
+    app.config["TESTING"] = True
+    app.config["DEBUG"] = False
+    app.config["SQLALCHEMY_DATABASE_URI"] = DATABASE_URI
+    # keep SQLAlchemy bookkeeping to a minimum while testing
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    app.config["SQLALCHEMY_ECHO"] = False
+    app.config["SQLALCHEMY_RECORD_QUERIES"] = False
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+        "echo": False,
+        "future": True,
+        "pool_pre_ping": False,
+    }
+    app.logger.setLevel(logging.CRITICAL)
+    # close the engine the service opened on import before replacing it
+    db.engine.dispose()
+    init_db(app)
+    if db.engine.dialect.name == "sqlite":
+        # pysqlite does not emit BEGIN itself, which breaks SAVEPOINTs
+        event.listen(db.engine, "connect", _sqlite_connect)
+        event.listen(db.engine, "begin", _sqlite_begin)
+        db.engine.dispose()
+    db.create_all()
+    # open a QueuePool's connections up front so tests only check out warm
+    # ones; in-memory SQLite's SingletonThreadPool holds a single connection,
+    # which create_all() has already opened
+    pool = db.engine.pool
+    if isinstance(pool, QueuePool):
+        connections = [db.engine.connect() for _ in range(pool.size())]
+        for connection in connections:
+            connection.close()
+    _DB_INITIALIZED = True
+
+
+def clear_table(model) -> None:
+    """Removes every row of a model's table
+
+    PostgreSQL can TRUNCATE the table in one step instead of deleting and
+    indexing row by row; other databases fall back to a DELETE.
+
+    :param model: the model class whose table should be emptied
+    :type model: db.Model
+
+    """
+    if db.engine.dialect.name == "postgresql":
+        db.session.execute(
+            text(f"TRUNCATE TABLE {model.__tablename__} RESTART IDENTITY CASCADE")
+        )
+    else:
+        db.session.query(model).delete()
+    db.session.commit()
+
+
+def _sqlite_connect(dbapi_connection, _):
+    """Tunes each new SQLite connection for throwaway test data"""
+    # let SQLAlchemy rather than pysqlite manage transactions
+    dbapi_connection.isolation_level = None
+    cursor = dbapi_connection.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(f"PRAGMA {pragma}")
+    cursor.close()
+
+
+def _sqlite_begin(connection):
+    """Emit our own BEGIN so SAVEPOINTs nest inside it"""
+    connection.exec_driver_sql("BEGIN")
@@ -0,0 +1,104 @@
+"""
+Per-worker databases for pytest-xdist
+
+This module must not import the service: tests/__init__.py uses it to pick
+the worker's database before anything connects to DATABASE_URI.
+"""
+import os
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+
+
+def worker_database_uri(database_uri: str) -> str:
+    """Returns a database URI that is private to the current pytest-xdist worker
+
+    Each worker of a PostgreSQL run gets its own database, which is created
+    here if it does not exist yet, and each worker of a file-backed SQLite
+    run gets its own file, named <stem>_<worker><suffix>. Both are removed
+    by drop_worker_database(). In-memory SQLite databases already live
+    inside each worker process, so their URI is returned unchanged, as it
+    is outside pytest-xdist.
+
+    :param database_uri: the database URI shared by all workers
+    :type database_uri: str
+
+    :return: the database URI for this worker
+    :rtype: str
+
+    """
+    worker = os.getenv("PYTEST_XDIST_WORKER")
+    url = make_url(database_uri)
+    if not worker or _is_sqlite_memory(url):
+        return database_uri
+
+    backend = url.get_backend_name()
+    if backend == "sqlite":
+        stem, suffix = os.path.splitext(url.database)
+        database = f"{stem}_{worker}{suffix}"
+    elif backend == "postgresql":
+        database = f"{url.database}_{worker}"
+        _create_postgres_database(url, database)
+    else:
+        raise RuntimeError(
+            f"Cannot give pytest-xdist workers their own {backend} database; "
+            "run without -n or use SQLite or PostgreSQL"
+        )
+    return url.set(database=database).render_as_string(hide_password=False)
+
+
+def drop_worker_database(database_uri: str, worker_url) -> None:
+    """Removes the database that worker_database_uri() made for this worker
+
+    Does nothing outside pytest-xdist or when the worker shares the
+    database. Every connection to the worker's database, including the
+    app's engine, must be closed first.
+
+    :param database_uri: the database URI shared by all workers
+    :type database_uri: str
+
+    :param worker_url: the URL the app's engine used for this worker
+    :type worker_url: sqlalchemy.engine.URL
+
+    """
+    url = make_url(database_uri)
+    if (
+        not os.getenv("PYTEST_XDIST_WORKER")
+        or _is_sqlite_memory(url)
+        or worker_url.database == url.database
+    ):
+        return
+
+    if worker_url.get_backend_name() == "sqlite":
+        path = worker_url.database
+        if worker_url.query.get("uri"):
+            path = path[len("file:"):]
+        for suffix in ("", "-journal", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        return
+
+    # DROP DATABASE cannot run inside a transaction block
+    engine = create_engine(url, isolation_level="AUTOCOMMIT")
+    with engine.connect() as conn:
+        conn.execute(text(f'DROP DATABASE IF EXISTS "{worker_url.database}"'))
+    engine.dispose()
+
+
+def _create_postgres_database(url, database: str) -> None:
+    """Creates a PostgreSQL database next to the one at url, if it is missing"""
+    # CREATE DATABASE cannot run inside a transaction block
+    engine = create_engine(url, isolation_level="AUTOCOMMIT")
+    with engine.connect() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM pg_database WHERE datname = :name"), {"name": database}
+        ).scalar()
+        if not exists:
+            conn.execute(text(f'CREATE DATABASE "{database}"'))
+    engine.dispose()
+
+
+def _is_sqlite_memory(url) -> bool:
+    """Returns True for SQLite databases that only live in memory"""
+    return url.get_backend_name() == "sqlite" and (
+        url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+    )